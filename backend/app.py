@@ -1,7 +1,11 @@
 from flask import Flask, request, jsonify, send_file, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 import yt_dlp
+import orjson
 import os
+import gc
 import json
 import uuid
 import threading
@@ -9,16 +13,370 @@ import time
 from datetime import datetime
 import tempfile
 import shutil
-from urllib.parse import urlparse, parse_qs
+import queue
+import io
+import hashlib
+import heapq
+from urllib.parse import urlparse, parse_qs, quote
 import re
+import unicodedata
 import random
+import itertools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque, OrderedDict
+from functools import wraps
+from operator import itemgetter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, wait, FIRST_COMPLETED
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (jsonify, get_json, app.json)"""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
-CORS(app, origins=["*"], allow_headers=["Content-Type"], methods=["GET", "POST", "OPTIONS"])
+app.json = OrjsonProvider(app)
+# Number of reverse proxies in front of the app (1 on Render). Their
+# X-Forwarded-For is trusted for client addresses; with no proxy the
+# header is client-controlled and must be ignored, or clients could
+# dodge the per-IP rate limit and pacing
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+CORS(app, origins=["*"], allow_headers=["Content-Type"], methods=["GET", "POST", "DELETE", "OPTIONS"])
+
+# Compress JSON bodies only; video files are sent as-is and the SSE progress
+# stream must not be held back in a compressor buffer. The lowest levels
+# already shrink repetitive JSON keys several times at little CPU cost.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_MIN_SIZE'] = 512
+app.config['COMPRESS_LEVEL'] = 1
+app.config['COMPRESS_BR_LEVEL'] = 1
+app.config['COMPRESS_STREAMS'] = False
+compress = Compress(app)
+
+class LimitedCache:
+    """Thread-safe LRU cache whose entries expire ttl seconds after being set
+
+    Bounded by entry count and, if max_bytes is given, by the total of the
+    sizes callers report for their values.
+    """
+    def __init__(self, max_size, ttl, max_bytes=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.cache = OrderedDict()  # key -> (expires_at, value, size), least recent first
+        self.lock = threading.Lock()
+
+    def get_with_ttl(self, key):
+        """Return (value, seconds left) for a fresh entry, else None"""
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.monotonic()
+            if remaining <= 0:
+                del self.cache[key]
+                self.current_bytes -= entry[2]
+                return None
+            self.cache.move_to_end(key)
+            return entry[1], remaining
+
+    def get(self, key):
+        entry = self.get_with_ttl(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, size=0, ttl=None):
+        """Store value for key, expiring after ttl seconds (default self.ttl)"""
+        with self.lock:
+            self._insert(key, value, size, time.monotonic(), ttl)
+
+    def _insert(self, key, value, size, now, ttl=None):
+        """Store key and evict past the limits; caller holds the lock"""
+        old = self.cache.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[2]
+        self.cache[key] = (now + (self.ttl if ttl is None else ttl), value, size)
+        self.current_bytes += size
+        while len(self.cache) > self.max_size or (
+                self.max_bytes is not None and self.current_bytes > self.max_bytes and len(self.cache) > 1):
+            self.current_bytes -= self.cache.popitem(last=False)[1][2]
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self.cache)
+
+class TinyLFUCache(LimitedCache):
+    """LimitedCache with TinyLFU admission
+
+    Accesses are counted in a 4-row count-min sketch of 4-bit counters,
+    behind a doorkeeper bitmap that absorbs keys seen only once. When the
+    cache is full a new key only replaces the LRU victim if it has been
+    requested more often, so one-off lookups cannot flush popular entries.
+    """
+    DEPTH = 4
+
+    def __init__(self, max_size, ttl, max_bytes=None):
+        super().__init__(max_size, ttl, max_bytes)
+        width = 1
+        while width < max_size * 8:
+            width <<= 1
+        self.mask = width - 1
+        self.sketch = [bytearray(width) for _ in range(self.DEPTH)]
+        self.doorkeeper = bytearray(width // 8)
+        self.sample_size = max_size * 10
+        self.accesses = 0
+
+    def _indexes(self, key):
+        # One counter per row, from successive multiplicative mixes of the hash
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        indexes = []
+        for row in range(self.DEPTH):
+            h = (h * 0x9E3779B97F4A7C15 + row) & 0xFFFFFFFFFFFFFFFF
+            indexes.append((h >> 32) & self.mask)
+        return indexes
+
+    def _record(self, key):
+        """Count one access to key; caller holds the lock"""
+        indexes = self._indexes(key)
+        byte, bit = divmod(indexes[0], 8)
+        if not self.doorkeeper[byte] & (1 << bit):
+            self.doorkeeper[byte] |= 1 << bit
+        else:
+            for row, index in zip(self.sketch, indexes):
+                if row[index] < 15:
+                    row[index] += 1
+        self.accesses += 1
+        if self.accesses >= self.sample_size:
+            # Age: halve every counter and forget the doorkeeper
+            for row in self.sketch:
+                row[:] = bytes(count >> 1 for count in row)
+            self.doorkeeper[:] = bytes(len(self.doorkeeper))
+            self.accesses //= 2
+
+    def _estimate(self, key):
+        indexes = self._indexes(key)
+        byte, bit = divmod(indexes[0], 8)
+        seen = 1 if self.doorkeeper[byte] & (1 << bit) else 0
+        return seen + min(row[index] for row, index in zip(self.sketch, indexes))
+
+    def get_with_ttl(self, key):
+        with self.lock:
+            self._record(key)
+        return super().get_with_ttl(key)
+
+    def set(self, key, value, size=0, ttl=None):
+        now = time.monotonic()
+        with self.lock:
+            full = len(self.cache) >= self.max_size or (
+                self.max_bytes is not None and self.current_bytes + size > self.max_bytes)
+            if key not in self.cache and full and self.cache:
+                victim, (expires_at, _, _) = next(iter(self.cache.items()))
+                if expires_at > now and self._estimate(key) <= self._estimate(victim):
+                    return
+            self._insert(key, value, size, now, ttl)
+
+class TokenBucket:
+    """Per-key token buckets refilled at rate tokens per second"""
+    def __init__(self, rate, capacity, max_keys=10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.buckets = {}  # key -> (tokens, monotonic time of last refill)
+        self.lock = threading.Lock()
+
+    def try_consume(self, key):
+        """Take a token for key; 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        with self.lock:
+            tokens, stamp = self.buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - stamp) * self.rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self.buckets[key] = (tokens - 1, now)
+            # Drop keys whose buckets have refilled
+            if len(self.buckets) > self.max_keys:
+                full_after = self.capacity / self.rate
+                for k in [k for k, (_, t) in self.buckets.items() if now - t >= full_after]:
+                    del self.buckets[k]
+            return 0
+
+class ConcurrencyTuner:
+    """Hill-climb a concurrency level on measured throughput
 
-# Store download progress
-download_progress = {}
+    Samples are smoothed with an EWMA. Every `window` samples the level
+    keeps moving in the same direction while throughput improves by 10%
+    or more, turns around when it falls by as much, and holds otherwise.
+    """
+    def __init__(self, initial, low, high, window=5, alpha=0.3):
+        self.level = initial
+        self.low = low
+        self.high = high
+        self.window = window
+        self.alpha = alpha
+        self.step = 1
+        self.ewma = None
+        self.reference = None  # ewma when the level last moved
+        self.samples = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        return self.level
+
+    def record(self, throughput):
+        with self.lock:
+            if self.ewma is None:
+                self.ewma = throughput
+            else:
+                self.ewma += self.alpha * (throughput - self.ewma)
+            self.samples += 1
+            if self.samples < self.window:
+                return
+            self.samples = 0
+            if self.reference is not None:
+                if self.ewma <= self.reference * 0.9:
+                    self.step = -self.step
+                elif self.ewma < self.reference * 1.1:
+                    return
+            self.reference = self.ewma
+            self.level = max(self.low, min(self.high, self.level + self.step))
+
+# Store download progress, oldest first; bounded so downloads that are
+# never fetched do not accumulate
+download_progress = OrderedDict()
+download_progress_lock = threading.Lock()
+MAX_TRACKED_DOWNLOADS = 512
+
+# Optional Redis mirror of download progress, shared between workers/hosts
+REDIS_URL = os.environ.get('REDIS_URL')
+PROGRESS_TTL = 7200  # seconds a progress entry is kept in Redis
+SSE_KEEPALIVE = 15  # seconds between keepalives on an idle progress stream
+# Saved changes are announced on this channel (plus download id), so
+# streams on other hosts reload as soon as the state changes
+PROGRESS_CHANNEL = 'dl-events:'
+PROGRESS_FIELDS = ('status', 'progress', 'speed', 'eta', 'size', 'title',
+                   'thumbnail', 'error', 'filename', 'file_path')
+# What clients see; file_path is a server-side detail
+PUBLIC_PROGRESS_FIELDS = tuple(field for field in PROGRESS_FIELDS if field != 'file_path')
+# Stamps each saved progress change; doubles as the /api/progress ETag
+progress_versions = itertools.count(1)
+
+# Successful /api/info payloads per video id, least recently used first
+INFO_CACHE_TTL = 300
+INFO_CACHE_MAX = 1024
+INFO_CACHE_MAX_BYTES = 8 * 1024 * 1024  # serialized payload bytes
+info_cache = TinyLFUCache(INFO_CACHE_MAX, INFO_CACHE_TTL, INFO_CACHE_MAX_BYTES)  # video_id -> (etag, payload)
+
+# Shared pool running the info extraction strategies in parallel
+INFO_WORKERS = int(os.environ.get('YTDL_INFO_WORKERS', '12'))
+info_executor = ThreadPoolExecutor(max_workers=INFO_WORKERS, thread_name_prefix='info')
+# At most MAX_CONCURRENT_INFO /api/info lookups race their strategies at
+# once; others wait up to INFO_SLOT_WAIT seconds before getting a 503
+MAX_CONCURRENT_INFO = 4
+INFO_SLOT_WAIT = 5
+info_slots = threading.BoundedSemaphore(MAX_CONCURRENT_INFO)
+# Lookups in progress per video; concurrent requests for the same video
+# wait on the first one instead of starting their own
+INFO_LOOKUP_TIMEOUT = 60
+info_inflight = {}  # video id (or url) -> Future of run_info_lookup's result
+info_inflight_lock = threading.Lock()
+
+# Downloads run on a bounded pool; requests beyond MAX_PENDING_DOWNLOADS
+# (running plus queued) are turned away instead of piling up
+DOWNLOAD_WORKERS = int(os.environ.get('YTDL_WORKERS', '8'))
+MAX_PENDING_DOWNLOADS = 16
+download_executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix='ytdl')
+download_slots = threading.BoundedSemaphore(MAX_PENDING_DOWNLOADS)
+active_downloads = 0  # downloads currently running, reported by /api/health
+pending_downloads = 0  # downloads submitted and not yet finished
+active_downloads_lock = threading.Lock()
+# Optional cap on a download's size in bytes; yt-dlp checks it against
+# Content-Length and aborts before fetching anything larger
+MAX_DOWNLOAD_BYTES = int(os.environ.get('YTDL_MAX_FILESIZE', '0')) or None
+
+# Idle YoutubeDL instances for info extraction, per strategy. Building one
+# loads every extractor, so instances are checked out and returned instead
+# of being created per request; YoutubeDL is not thread safe, so an
+# instance is only ever used by one thread at a time.
+MAX_IDLE_YDL = 4  # per strategy
+ydl_pool = {}  # (strategy index, cookies present, cookies generation) -> list of idle YoutubeDL
+ydl_pool_lock = threading.Lock()
+
+# Digest of the cookie file we last wrote, so re-submitting the same
+# cookies neither rewrites the file nor throws away the pool. The
+# generation counts cookie file replacements; YoutubeDL writes its cookie
+# jar back on close, which must not happen for one loaded from an older file.
+cookies_digest = None
+cookies_generation = 0
+cookies_digest_lock = threading.Lock()
+
+# Recent extraction failures per video id, so known-bad videos are not
+# retried against YouTube on every request
+FAILURE_CACHE_TTL = 300
+FAILURE_CACHE_MAX = 4096
+failed_videos = LimitedCache(FAILURE_CACHE_MAX, FAILURE_CACHE_TTL)  # video_id -> (payload, status_code)
+
+# Per-client request limit on the endpoints that hit YouTube
+RATE_LIMIT_REQUESTS = 10
+RATE_LIMIT_WINDOW = 60  # seconds
+client_requests = {}  # client ip -> deque of request timestamps
+client_requests_lock = threading.Lock()
+
+# Last time each client made us contact YouTube. The anti-detection delays
+# only apply to clients that did so within the pacing window.
+PACING_WINDOW = 30  # seconds
+last_youtube_hit = {}  # client ip -> timestamp
+last_youtube_hit_lock = threading.Lock()
+
+# /api/info pacing: a short burst per client, then one lookup every
+# INFO_PACING_INTERVAL seconds. Over-eager clients get a 429 with
+# Retry-After instead of holding a worker in a sleep.
+INFO_PACING_BURST = 3
+INFO_PACING_INTERVAL = 2  # seconds
+info_pacing = TokenBucket(1 / INFO_PACING_INTERVAL, INFO_PACING_BURST)
+
+# Per-download working directories live under one base directory
+WORK_DIR = os.path.join(tempfile.gettempdir(), 'ytultrahd_work')
+os.makedirs(WORK_DIR, exist_ok=True)
+
+# Downloads that were never fetched (or were handed to nginx) are swept
+# by the janitor once they are this old
+WORK_DIR_MAX_AGE = 3600  # seconds
+SWEEP_INTERVAL = 300  # seconds
+
+# When set (e.g. /internal_downloads/), completed files are served by nginx
+# through X-Accel-Redirect from an internal location aliased to WORK_DIR
+ACCEL_REDIRECT_PREFIX = os.environ.get('ACCEL_REDIRECT_PREFIX', '')
+
+# Directories waiting to be removed by the janitor thread
+cleanup_queue = queue.Queue()
+janitor_thread = None
+janitor_lock = threading.Lock()
+last_sweep = 0.0  # monotonic time of the last work directory sweep
+
+# Parallel fragment fetches for DASH/HLS downloads (YouTube throttles per stream)
+CONCURRENT_FRAGMENTS = int(os.environ.get('YTDL_CONCURRENT_FRAGS', '8'))
+MAX_CONCURRENT_FRAGMENTS = 16
+# Downloads that do not ask for a fragment count use this one, tuned on
+# the throughput of earlier downloads; yt-dlp cannot change it mid-job
+fragment_tuner = ConcurrencyTuner(CONCURRENT_FRAGMENTS, 1, MAX_CONCURRENT_FRAGMENTS)
 
 # Enhanced user agents pool
 USER_AGENTS = [
@@ -30,10 +388,389 @@ USER_AGENTS = [
     'Mozilla/5.0 (Linux; Android 13; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36',
 ]
 
+# Video ID patterns, compiled once
+VIDEO_ID_PATTERNS = (
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube(?:-nocookie)?\.com\/(?:embed|v)\/)([^&\n?#]+)'),
+    re.compile(r'youtube\.com\/(?:shorts|live)\/([^&\n?#]+)')
+)
+YOUTUBE_HOSTS = frozenset(('www.youtube.com', 'youtube.com', 'm.youtube.com', 'music.youtube.com'))
+# Video page URLs the API accepts, matched in one pass
+YOUTUBE_URL_RE = re.compile(
+    r'^(?:https?://)?(?:(?:www|m|music)\.)?'
+    r'(?:youtube\.com/(?:watch|shorts/|embed/|live/|v/)|youtube-nocookie\.com/embed/|youtu\.be/)',
+    re.IGNORECASE
+)
+
+# Round-robin over the pool; next() on a cycle is atomic under the GIL
+_user_agent_cycle = itertools.cycle(USER_AGENTS)
+
+# Keep-alive session for direct YouTube API calls (oembed), so repeated
+# lookups reuse pooled TLS connections
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
+http_session.headers.update({
+    'Referer': 'https://www.youtube.com/',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate'
+})
+
+# Quality preset -> yt-dlp format selector. Presets up to 720p take a
+# pre-muxed MP4 stream of exactly that height when there is one, which
+# needs no ffmpeg merge pass; otherwise they merge the best streams.
+QUALITY_FORMATS = {
+    'best': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+    '8k': 'bestvideo[height<=4320]+bestaudio/best[height<=4320]/best',
+    '4k': 'bestvideo[height<=2160]+bestaudio/best[height<=2160]/best',
+    '2k': 'bestvideo[height<=1440]+bestaudio/best[height<=1440]/best',
+    '1080p': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
+    '720p': 'best[height=720][ext=mp4]/bestvideo[height<=720]+bestaudio/best[height<=720]/best',
+    '480p': 'best[height=480][ext=mp4]/bestvideo[height<=480]+bestaudio/best[height<=480]/best',
+    '360p': 'best[height=360][ext=mp4]/bestvideo[height<=360]+bestaudio/best[height<=360]/best',
+    '240p': 'best[height=240][ext=mp4]/bestvideo[height<=240]+bestaudio/best[height<=240]/best'
+}
+
+# Extensions of finished downloads, as opposed to .part/.ytdl leftovers
+MEDIA_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.mov', '.avi', '.m4a', '.mp3')
+# Content-Type per extension; merges come out as mp4, but single-file
+# fallbacks keep whatever container YouTube served
+MEDIA_MIMETYPES = {
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+    '.mov': 'video/quicktime',
+    '.avi': 'video/x-msvideo',
+    '.m4a': 'audio/mp4',
+    '.mp3': 'audio/mpeg'
+}
+
+# Info extraction strategies, tried in order
+INFO_STRATEGIES = (
+    # Strategy 1: iOS client with fresh headers
+    {
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['ios'],
+                'player_skip': ['webpage', 'configs'],
+                'skip': ['hls', 'dash', 'translated_subs']
+            }
+        },
+        'http_headers': {
+            'User-Agent': 'com.google.ios.youtube/19.29.1 (iPhone16,2; U; CPU iOS 17_5_1 like Mac OS X;)',
+            'X-YouTube-Client-Name': '5',
+            'X-YouTube-Client-Version': '19.29.1'
+        }
+    },
+    # Strategy 2: Android TV client
+    {
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['android_tv'],
+                'player_skip': ['configs'],
+                'skip': ['translated_subs']
+            }
+        }
+    },
+    # Strategy 3: TV embed with bypass
+    {
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['tv_embed'],
+                'player_skip': ['webpage'],
+                'bypass_age_gate': True
+            }
+        }
+    }
+)
+
+# Download strategies, tried in order. Strategies without a 'format'
+# use the format selector of the requested quality.
+DOWNLOAD_STRATEGIES = (
+    # Strategy 1: Mobile client with minimal options
+    {
+        'format': 'best[height<=720]/best',  # Lower quality for mobile
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['ios'],
+                'player_skip': ['webpage', 'configs', 'js'],
+                'skip': ['hls', 'dash', 'translated_subs']
+            }
+        },
+        'http_headers': {
+            'User-Agent': 'com.google.ios.youtube/19.29.1 (iPhone16,2; U; CPU iOS 17_5_1 like Mac OS X;)',
+            'Accept': '*/*',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate',
+            'X-YouTube-Client-Name': '5',
+            'X-YouTube-Client-Version': '19.29.1'
+        }
+    },
+    # Strategy 2: Android client
+    {
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['android'],
+                'player_skip': ['webpage', 'configs'],
+                'skip': ['hls', 'dash']
+            }
+        },
+        'http_headers': {
+            'User-Agent': 'com.google.android.youtube/19.29.37 (Linux; U; Android 13; en_US)',
+            'X-YouTube-Client-Name': '3',
+            'X-YouTube-Client-Version': '19.29.37'
+        }
+    },
+    # Strategy 3: Web client with cookie refresh
+    {
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['web'],
+                'player_skip': ['js'],
+                'skip': ['hls', 'translated_subs']
+            }
+        },
+        'http_headers': {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        }
+    },
+    # Strategy 4: TV embedded player (often bypasses restrictions)
+    {
+        'format': 'best[height<=1080]/best',
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['tv_embedded'],
+                'player_skip': ['webpage', 'configs'],
+                'bypass_age_gate': True
+            }
+        }
+    },
+    # Strategy 5: Direct format ID (fallback)
+    {
+        'format': '22/18/best',  # Direct format IDs for 720p/360p
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['android'],
+                'skip': ['hls', 'dash', 'translated_subs']
+            }
+        }
+    }
+)
+
+# yt-dlp options shared by every request; get_enhanced_ydl_opts() adds
+# the per-request user agent and cookie file
+BASE_YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'noprogress': True,
+    'no_color': True,
+    
+    # Browser simulation
+    'referer': 'https://www.youtube.com/',
+    
+    # Enhanced headers to mimic real browser
+    'http_headers': {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Cache-Control': 'no-cache',
+        'Pragma': 'no-cache',
+        'DNT': '1',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1',
+        'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+        'Sec-Ch-Ua-Mobile': '?0',
+        'Sec-Ch-Ua-Platform': '"Windows"',
+        'Origin': 'https://www.youtube.com',
+        'Connection': 'keep-alive'
+    },
+    
+    # Network and retry settings
+    'socket_timeout': 60,
+    'retries': 15,
+    'fragment_retries': 15,
+    'skip_unavailable_fragments': True,
+    'keep_fragments': False,
+    'concurrent_fragment_downloads': CONCURRENT_FRAGMENTS,
+    'http_chunk_size': 10485760,  # 10MB chunks max for YouTube
+    
+    # Rate limiting
+    'sleep_interval': 3,
+    'max_sleep_interval': 8,
+    'sleep_interval_requests': 2,
+    
+    # Enhanced YouTube extractor args
+    'extractor_args': {
+        'youtube': {
+            'player_client': ['ios', 'android', 'tv_embed'],
+            'player_skip': ['webpage', 'configs'],
+            'skip': ['hls', 'dash', 'translated_subs'],
+            'innertube_host': 'youtubei.googleapis.com',
+            'comment_sort': 'top',
+            'max_comments': 0,
+            'max_comment_depth': 0
+        }
+    },
+    
+    # Format preferences
+    'format_sort': [
+        'res:1080',
+        'fps:30', 
+        'codec:h264',
+        'size',
+        'br',
+        'asr',
+        'proto'
+    ]
+}
+
+# Overrides for metadata-only extraction
+INFO_YDL_OVERRIDES = {
+    'extract_flat': False,
+    'skip_download': True,
+    'getcomments': False,
+    'writesubtitles': False,
+    'writeautomaticsub': False,
+    'ignoreerrors': False
+}
+
+# Overrides for downloads; the per-download format, output template and
+# hooks are added on top
+DOWNLOAD_YDL_OVERRIDES = {
+    # Per-download sleeps would serialize the parallel fragment fetches
+    'sleep_interval': None,
+    'max_sleep_interval': None,
+    'merge_output_format': 'mp4',
+    'prefer_free_formats': False,
+    'prefer_ffmpeg': True,
+    'keepvideo': False,
+    'writeinfojson': False,
+    'max_filesize': MAX_DOWNLOAD_BYTES,
+    'writethumbnail': False,
+    'writesubtitles': False,
+    'writeautomaticsub': False,
+    'getcomments': False,
+    'ignoreerrors': False,
+    'no_check_certificate': True,
+    'geo_bypass': True,
+    'geo_bypass_country': 'US',
+    'prefer_insecure': True
+}
+
+# Optional aria2c for single-URL streams, which it fetches over several
+# connections. yt-dlp's 'http' key covers https too, so this takes every
+# YouTube stream (adaptive ones included) except fragmented DASH. aria2c
+# has no size cap, so it stays off when YTDL_MAX_FILESIZE is set, and its
+# downloads do not use concurrent_fragments, so they skip the tuner.
+USE_ARIA2C = (os.environ.get('YTDL_USE_ARIA2C') == '1' and not MAX_DOWNLOAD_BYTES
+              and shutil.which('aria2c') is not None)
+if USE_ARIA2C:
+    DOWNLOAD_YDL_OVERRIDES['external_downloader'] = {'http': 'aria2c'}
+    DOWNLOAD_YDL_OVERRIDES['external_downloader_args'] = {
+        'aria2c': ['-x', '8', '-s', '8', '-k', '1M']
+    }
+
+def build_download_template(format_string, strategy):
+    """Static yt-dlp options for one download strategy at one quality"""
+    opts = {**BASE_YDL_OPTS, **DOWNLOAD_YDL_OVERRIDES, 'format': strategy.get('format', format_string)}
+    if 'extractor_args' in strategy:
+        opts['extractor_args'] = strategy['extractor_args']
+    if 'http_headers' in strategy:
+        opts['http_headers'] = {**opts['http_headers'], **strategy['http_headers']}
+    return opts
+
+# Quality preset -> per-strategy option templates, built once; a download
+# only adds its user agent, cookie file, output template and hooks
+DOWNLOAD_OPTS_TEMPLATES = {
+    quality: tuple(build_download_template(format_string, strategy) for strategy in DOWNLOAD_STRATEGIES)
+    for quality, format_string in QUALITY_FORMATS.items()
+}
+
+# Keys of a successful /api/info payload
+INFO_KEYS = ('title', 'thumbnail', 'duration', 'uploader', 'view_count',
+             'upload_date', 'description', 'video_formats', 'audio_formats',
+             'best_video', 'best_audio', 'video_id', 'webpage_url',
+             'strategy_used', 'formats_available', 'status')
+
+# Static response bodies, serialized once at import
+ROOT_JSON = app.json.dumps({
+    'service': 'Enhanced YouTube Downloader API',
+    'version': '3.0.0',
+    'status': 'running',
+    'features': [
+        'Cookie-based authentication',
+        'Enhanced bot detection bypass',
+        'Multiple extraction strategies',
+        'Automatic browser cookie extraction'
+    ],
+    'endpoints': {
+        'health': '/api/health',
+        'info': '/api/info',
+        'download': '/api/download',
+        'formats': '/api/formats',
+        'setup_cookies': '/api/setup-cookies',
+        'manual_cookies': '/api/manual-cookies',
+        'cookie_status': '/api/cookie-status',
+        'instructions': '/api/cookie-instructions'
+    }
+})
+
+FORMATS_JSON = app.json.dumps({
+    'video_qualities': [
+        {'id': 'best', 'label': 'Best Available', 'description': 'Highest quality available'},
+        {'id': '8k', 'label': '8K (4320p)', 'description': 'Ultra HD 8K'},
+        {'id': '4k', 'label': '4K (2160p)', 'description': 'Ultra HD 4K'},
+        {'id': '2k', 'label': '2K (1440p)', 'description': 'Quad HD'},
+        {'id': '1080p', 'label': '1080p', 'description': 'Full HD'},
+        {'id': '720p', 'label': '720p', 'description': 'HD'},
+        {'id': '480p', 'label': '480p', 'description': 'SD'},
+        {'id': '360p', 'label': '360p', 'description': 'Low'},
+        {'id': '240p', 'label': '240p', 'description': 'Very Low'},
+    ],
+    'note': 'Enhanced with cookie-based authentication and bot detection bypass'
+})
+
+# /api/health body with %-slots for the per-request fields
+HEALTH_TEMPLATE = app.json.dumps({
+    'status': 'ok',
+    'timestamp': '%(timestamp)s',
+    'service': 'Enhanced YouTube Downloader API',
+    'yt_dlp_version': yt_dlp.version.__version__,
+    'cookie_status': '%(cookie_status)s',
+    'active_downloads': '%(active_downloads)s',
+    'download_slots_free': '%(download_slots_free)s',
+    'downloads_queued': '%(downloads_queued)s',
+    'info_cache_bytes': '%(info_cache_bytes)s'
+})
+# The counters are numbers, not strings
+for counter in ('active_downloads', 'download_slots_free', 'downloads_queued', 'info_cache_bytes'):
+    HEALTH_TEMPLATE = HEALTH_TEMPLATE.replace(f'"%({counter})s"', f'%({counter})d')
+HEALTH_TTL = 1  # seconds a rendered /api/health body is reused
+health_body = (0.0, '')  # (monotonic expiry, rendered body)
+
 class DownloadProgress:
+    # One instance per tracked download; slots keep them small and make
+    # the per-tick attribute writes in update() cheaper
+    __slots__ = ('download_id', 'status', 'progress', 'speed', 'eta', 'size',
+                 'title', 'thumbnail', 'error', 'file_path', 'filename',
+                 'version', '_snapshot', '_last_saved', '_last_update',
+                 '_save_interval', 'lock',
+                 'changed', 'future')
+
     def __init__(self, download_id):
         self.download_id = download_id
-        self.status = 'preparing'
+        self.status = 'queued'
         self.progress = 0
         self.speed = '0 B/s'
         self.eta = 'Unknown'
@@ -43,17 +780,441 @@ class DownloadProgress:
         self.error = None
         self.file_path = None
         self.filename = ''
+        self.version = 0
+        # (version, JSON body of the public fields) served to pollers
+        self._snapshot = None
+        self._last_saved = 0.0
+        self._last_update = 0.0
+        self._save_interval = None
+        # Guards multi-field transitions (e.g. file_path + status)
+        self.lock = threading.Lock()
+        # Notified on every change, wakes /api/progress/<id>/stream; a
+        # condition rather than an event so several listeners can wait
+        # without clearing each other's wakeups
+        self.changed = threading.Condition()
+        # Pool future of the download job, on the host that runs it
+        self.future = None
 
     def update(self, d):
+        now = time.monotonic()
         if d['status'] == 'downloading':
+            # yt-dlp calls this per chunk; take at most 4 ticks a second
+            if now - self._last_update < 0.25:
+                return
+            self._last_update = now
             self.status = 'downloading'
             self.progress = d.get('_percent_str', '0%').replace('%', '')
             self.speed = d.get('_speed_str', '0 B/s')
             self.eta = d.get('_eta_str', 'Unknown')
             self.size = d.get('_total_bytes_str', '0 B')
+            # Mirror while bytes are flowing every 1 s for files up to 100 MB,
+            # stretching to 5 s for 500 MB+; big downloads move slowly in %
+            if self._save_interval is None:
+                total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                self._save_interval = max(1.0, min(5.0, total / 1e8))
+            if now - self._last_saved < self._save_interval:
+                self._bump()
+                return
         elif d['status'] == 'finished':
             self.status = 'processing'
             self.progress = 100
+        self.save(now)
+
+    def to_dict(self, fields=PROGRESS_FIELDS):
+        with self.lock:
+            return {field: getattr(self, field) for field in fields}
+
+    def _bump(self):
+        """Stamp a new version and wake progress streams"""
+        with self.changed:
+            self.version = next(progress_versions)
+            self.changed.notify_all()
+
+    def snapshot(self):
+        """Return (version, JSON body) of the public fields as of the last save"""
+        version = self.version
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != version:
+            snapshot = self._snapshot = (version, orjson.dumps(self.to_dict(PUBLIC_PROGRESS_FIELDS)))
+        return snapshot
+
+    def save(self, now=None):
+        """Notify progress streams and mirror the state to Redis, if configured"""
+        self._last_saved = time.monotonic() if now is None else now
+        self._bump()
+        if redis_client is None:
+            return
+        key = f'dl:{self.download_id}'
+        mapping = {k: '' if v is None else str(v) for k, v in self.to_dict().items()}
+        mapping['version'] = self.version
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, PROGRESS_TTL)
+            pipe.publish(PROGRESS_CHANNEL + self.download_id, self.version)
+            pipe.execute()
+        except Exception as e:
+            print(f"Failed to save progress to Redis: {str(e)}")
+
+    @classmethod
+    def from_dict(cls, download_id, data):
+        progress = cls(download_id)
+        for field in PROGRESS_FIELDS:
+            if field in data:
+                setattr(progress, field, data[field])
+        # Redis stores None as an empty string
+        progress.error = progress.error or None
+        progress.file_path = progress.file_path or None
+        progress.version = int(data.get('version') or 0)
+        return progress
+
+def init_redis():
+    """Connect to Redis when REDIS_URL is configured"""
+    if not REDIS_URL:
+        return None
+    try:
+        import redis
+        
+        pool = redis.BlockingConnectionPool.from_url(REDIS_URL, max_connections=32, decode_responses=True)
+        client = redis.Redis(connection_pool=pool)
+        client.ping()
+        print("Using Redis for download progress and video info")
+        return client
+    except ImportError:
+        print("redis not installed. Install with: pip install redis")
+    except Exception as e:
+        print(f"Failed to connect to Redis: {str(e)}")
+    return None
+
+redis_client = init_redis()
+
+class ProgressEvents:
+    """Fan Redis progress announcements out to the streams waiting on them
+
+    A single pattern subscription per process serves every progress stream
+    following a download that runs on another host, so streams do not each
+    hold a connection from the shared Redis pool.
+    """
+    def __init__(self):
+        self.followers = {}  # download id -> [streams, announcements seen]
+        self.changed = threading.Condition()
+        self.thread = None
+
+    def follow(self, download_id):
+        """Start watching download_id; returns its announcement count"""
+        with self.changed:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._listen, name='progress-events', daemon=True)
+                self.thread.start()
+            entry = self.followers.setdefault(download_id, [0, 0])
+            entry[0] += 1
+            return entry[1]
+
+    def unfollow(self, download_id):
+        with self.changed:
+            entry = self.followers[download_id]
+            entry[0] -= 1
+            if not entry[0]:
+                del self.followers[download_id]
+
+    def wait(self, download_id, seen, timeout):
+        """Wait up to timeout for an announcement after seen; returns the new count"""
+        with self.changed:
+            entry = self.followers[download_id]
+            self.changed.wait_for(lambda: entry[1] != seen, timeout=timeout)
+            return entry[1]
+
+    def _listen(self):
+        while True:
+            events = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                events.psubscribe(PROGRESS_CHANNEL + '*')
+                for message in events.listen():
+                    download_id = message['channel'][len(PROGRESS_CHANNEL):]
+                    with self.changed:
+                        entry = self.followers.get(download_id)
+                        if entry is not None:
+                            entry[1] += 1
+                            self.changed.notify_all()
+            except Exception as e:
+                print(f"Progress event subscription failed: {str(e)}")
+                time.sleep(1)
+            finally:
+                events.close()
+
+progress_events = ProgressEvents()
+
+def track_progress(progress):
+    """Start tracking a download, evicting the oldest beyond the limit"""
+    evicted = []
+    with download_progress_lock:
+        download_progress[progress.download_id] = progress
+        while len(download_progress) > MAX_TRACKED_DOWNLOADS:
+            evicted.append(download_progress.popitem(last=False)[1])
+    for old in evicted:
+        schedule_cleanup(os.path.join(WORK_DIR, old.download_id))
+
+def load_progress(download_id):
+    """Find a download's progress locally, falling back to Redis"""
+    with download_progress_lock:
+        progress = download_progress.get(download_id)
+    if progress is not None or redis_client is None:
+        return progress
+    try:
+        data = redis_client.hgetall(f'dl:{download_id}')
+    except Exception as e:
+        print(f"Failed to load progress from Redis: {str(e)}")
+        return None
+    return DownloadProgress.from_dict(download_id, data) if data else None
+
+def forget_progress(download_id):
+    """Drop a download's progress locally and from Redis"""
+    with download_progress_lock:
+        download_progress.pop(download_id, None)
+    if redis_client is not None:
+        try:
+            redis_client.delete(f'dl:{download_id}')
+        except Exception as e:
+            print(f"Failed to delete progress from Redis: {str(e)}")
+
+def next_user_agent():
+    """Pick the next user agent from the pool"""
+    return next(_user_agent_cycle)
+
+def random_delay(low, high):
+    """Sleep for a random duration between low and high seconds"""
+    time.sleep(low + (high - low) * random.random())
+
+def note_youtube_hit(ip):
+    """Record a YouTube request for ip; True if it made one recently"""
+    ip = ip or 'unknown'
+    now = time.monotonic()
+    with last_youtube_hit_lock:
+        last = last_youtube_hit.get(ip)
+        recent = last is not None and now - last < PACING_WINDOW
+        last_youtube_hit[ip] = now
+        # Drop clients that have gone quiet
+        if len(last_youtube_hit) > 10000:
+            for key in [k for k, v in last_youtube_hit.items() if now - v >= PACING_WINDOW]:
+                del last_youtube_hit[key]
+    return recent
+
+def get_cached_info(video_id):
+    """Return (etag, payload, seconds left) for a fresh cached /api/info result
+
+    Checks this process first, then results other workers stored in Redis.
+    """
+    if not video_id:
+        return None
+    cached = info_cache.get_with_ttl(video_id)
+    if cached is not None:
+        (etag, payload), remaining = cached
+        return etag, payload, int(remaining)
+    if redis_client is None:
+        return None
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(f'info:{video_id}')
+        pipe.ttl(f'info:{video_id}')
+        stored, remaining = pipe.execute()
+    except Exception as e:
+        print(f"Failed to load info from Redis: {str(e)}")
+        return None
+    if not stored or remaining <= 0:
+        return None
+    # Stored as "<etag> <payload JSON>"
+    etag, body = stored.split(' ', 1)
+    payload = orjson.loads(body)
+    info_cache.set(video_id, (etag, payload), len(body), ttl=remaining)
+    return etag, payload, remaining
+
+def cache_info(video_id, payload):
+    """Store a /api/info result and return its ETag"""
+    etag = hashlib.blake2b(f'{video_id}:{time.time()}'.encode(), digest_size=8).hexdigest()
+    if video_id:
+        body = orjson.dumps(payload)
+        info_cache.set(video_id, (etag, payload), len(body))
+        if redis_client is not None:
+            try:
+                redis_client.setex(f'info:{video_id}', INFO_CACHE_TTL, f'{etag} {body.decode()}')
+            except Exception as e:
+                print(f"Failed to save info to Redis: {str(e)}")
+    return etag
+
+def info_response(payload, etag, max_age):
+    """Build an /api/info response, honouring If-None-Match
+
+    max_age is how long the cached result stays fresh here, so browsers
+    and proxies do not keep it past the server's own expiry.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    # GET /api/info?url=... is cacheable by browsers and proxies
+    if request.method == 'GET':
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+def remember_failure(video_id, payload, status_code):
+    """Cache a failed extraction result for a video"""
+    if video_id:
+        failed_videos.set(video_id, (payload, status_code))
+
+def cached_failure(video_id):
+    """Return (payload, status_code, retry_after) for a recently failed video"""
+    entry = failed_videos.get_with_ttl(video_id)
+    if not entry:
+        return None
+    (payload, status_code), remaining = entry
+    return payload, status_code, int(remaining) + 1
+
+def check_rate_limit():
+    """Count the request against the client's limit; a 429 response if it is over"""
+    ip = request.remote_addr or 'unknown'
+    now = time.monotonic()
+    with client_requests_lock:
+        hits = client_requests.get(ip)
+        if hits is None:
+            hits = client_requests[ip] = deque()
+        while hits and now - hits[0] >= RATE_LIMIT_WINDOW:
+            hits.popleft()
+        if len(hits) >= RATE_LIMIT_REQUESTS:
+            retry_after = int(RATE_LIMIT_WINDOW - (now - hits[0])) + 1
+            response = jsonify({
+                'error': 'Too many requests',
+                'message': f'Limit is {RATE_LIMIT_REQUESTS} requests per {RATE_LIMIT_WINDOW} seconds',
+                'retry_after': retry_after
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        hits.append(now)
+        # Drop clients that have gone quiet
+        if len(client_requests) > 10000:
+            for key in [k for k, v in client_requests.items() if not v or now - v[-1] >= RATE_LIMIT_WINDOW]:
+                del client_requests[key]
+    return None
+
+def rate_limited(view):
+    """Limit each client to RATE_LIMIT_REQUESTS per RATE_LIMIT_WINDOW"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        limited = check_rate_limit()
+        if limited is not None:
+            return limited
+        return view(*args, **kwargs)
+    return wrapper
+
+class CleanupFile(io.FileIO):
+    """Read-only file that runs a callback when closed after being read in full
+
+    A client that drops the connection partway leaves the file in place,
+    so the download can be retried or resumed; the janitor's age-based
+    sweep removes it eventually.
+    """
+    def __init__(self, path, on_close):
+        super().__init__(path, 'rb')
+        self._on_close = on_close
+        self._size = os.fstat(self.fileno()).st_size
+        self._bytes_read = 0
+
+    def disarm(self):
+        self._on_close = None
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if data:
+            self._bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        if count:
+            self._bytes_read += count
+        return count
+
+    def close(self):
+        if self.closed:
+            return
+        complete = self._bytes_read >= self._size
+        super().close()
+        on_close, self._on_close = self._on_close, None
+        if on_close and complete:
+            on_close()
+
+def set_attachment(headers, filename):
+    """Set Content-Disposition: attachment the way werkzeug's send_file does
+
+    Header values must be latin-1, so non-ASCII names get an ASCII
+    fallback in filename= and the full name in RFC 5987 filename*=.
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        headers.set('Content-Disposition', 'attachment', **{
+            'filename': simple,
+            'filename*': "UTF-8''" + quote(filename, safe="!#$&+^`|~")
+        })
+    else:
+        headers.set('Content-Disposition', 'attachment', filename=filename)
+
+def sweep_work_dir():
+    """Remove work directories older than WORK_DIR_MAX_AGE"""
+    global last_sweep
+    # A restarted janitor must not repeat a sweep that just ran
+    now = time.monotonic()
+    if now - last_sweep < SWEEP_INTERVAL / 2:
+        return
+    last_sweep = now
+    cutoff = time.time() - WORK_DIR_MAX_AGE
+    # Work directories are named by download id; long downloads still
+    # running keep theirs whatever its age
+    with download_progress_lock:
+        running = {download_id for download_id, progress in download_progress.items()
+                   if progress.status not in ('completed', 'error')}
+    stale = deque()
+    # Finish the directory read before deleting, so a slow removal does
+    # not hold the scan open
+    with os.scandir(WORK_DIR) as entries:
+        for entry in entries:
+            if entry.name in running:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                    stale.append(entry.path)
+            except OSError:
+                pass
+    while stale:
+        shutil.rmtree(stale.popleft(), ignore_errors=True)
+
+def janitor():
+    """Remove queued work directories off the request path"""
+    while True:
+        if time.monotonic() - last_sweep >= SWEEP_INTERVAL:
+            sweep_work_dir()
+        try:
+            shutil.rmtree(cleanup_queue.get(timeout=SWEEP_INTERVAL), ignore_errors=True)
+        except queue.Empty:
+            pass
+
+def ensure_janitor():
+    """Start the janitor thread if it is not running"""
+    global janitor_thread
+    # Started lazily so it also exists in forked server workers
+    if janitor_thread is None or not janitor_thread.is_alive():
+        with janitor_lock:
+            if janitor_thread is None or not janitor_thread.is_alive():
+                janitor_thread = threading.Thread(target=janitor, name='janitor', daemon=True)
+                janitor_thread.start()
+
+def schedule_cleanup(path):
+    """Queue a work directory for removal by the janitor thread"""
+    ensure_janitor()
+    cleanup_queue.put(path)
 
 def get_browser_cookies():
     """Extract cookies from browser"""
@@ -84,97 +1245,49 @@ def get_browser_cookies():
         
     return None, None
 
+def store_cookie_file(content, filename='cookies.txt'):
+    """Write the cookie file unless it already holds content
+
+    The file is replaced atomically so extractions never read a partial
+    file. Only when the cookies changed are the YoutubeDL pool reset and
+    the cached failures dropped, since those may have been auth errors
+    the new cookies fix.
+    """
+    global cookies_digest, cookies_generation
+    digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+    with cookies_digest_lock:
+        if digest == cookies_digest and os.path.exists(filename):
+            return
+        temp_path = f'{filename}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, filename)
+        cookies_digest = digest
+        cookies_generation += 1
+    reset_ydl_pool()
+    failed_videos.clear()
+
 def save_cookies_to_file(cookies, filename='cookies.txt'):
     """Save cookies to Netscape format file"""
     try:
-        with open(filename, 'w') as f:
-            f.write('# Netscape HTTP Cookie File\n')
-            f.write('# Generated by yt-dlp YouTube Downloader\n\n')
+        lines = ['# Netscape HTTP Cookie File\n', '# Generated by yt-dlp YouTube Downloader\n\n']
+        for cookie in cookies:
+            # Format: domain, domain_specified, path, secure, expires, name, value
+            domain_specified = 'TRUE' if cookie.domain.startswith('.') else 'FALSE'
+            secure = 'TRUE' if cookie.secure else 'FALSE'
+            expires = str(int(cookie.expires)) if cookie.expires else '0'
             
-            for cookie in cookies:
-                # Format: domain, domain_specified, path, secure, expires, name, value
-                domain_specified = 'TRUE' if cookie.domain.startswith('.') else 'FALSE'
-                secure = 'TRUE' if cookie.secure else 'FALSE'
-                expires = str(int(cookie.expires)) if cookie.expires else '0'
-                
-                f.write(f"{cookie.domain}\t{domain_specified}\t{cookie.path}\t{secure}\t{expires}\t{cookie.name}\t{cookie.value}\n")
+            lines.append(f"{cookie.domain}\t{domain_specified}\t{cookie.path}\t{secure}\t{expires}\t{cookie.name}\t{cookie.value}\n")
         
+        store_cookie_file(''.join(lines), filename)
         return True
     except Exception as e:
         print(f"Error saving cookies: {str(e)}")
         return False
 
-def get_enhanced_ydl_opts():
-    """Get enhanced yt-dlp options with proper authentication"""
-    
-    # Base configuration
-    opts = {
-        'quiet': True,
-        'no_warnings': True,
-        'no_color': True,
-        
-        # Browser simulation
-        'user_agent': random.choice(USER_AGENTS),
-        'referer': 'https://www.youtube.com/',
-        
-        # Enhanced headers to mimic real browser
-        'http_headers': {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache',
-            'DNT': '1',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"',
-            'Origin': 'https://www.youtube.com',
-            'Connection': 'keep-alive'
-        },
-        
-        # Network and retry settings
-        'socket_timeout': 60,
-        'retries': 15,
-        'fragment_retries': 15,
-        'skip_unavailable_fragments': True,
-        'keep_fragments': False,
-        'concurrent_fragment_downloads': 1,
-        'http_chunk_size': 10485760,  # 10MB chunks max for YouTube
-        
-        # Rate limiting
-        'sleep_interval': 3,
-        'max_sleep_interval': 8,
-        'sleep_interval_requests': 2,
-        
-        # Enhanced YouTube extractor args
-        'extractor_args': {
-            'youtube': {
-                'player_client': ['ios', 'android', 'tv_embed'],
-                'player_skip': ['webpage', 'configs'],
-                'skip': ['hls', 'dash', 'translated_subs'],
-                'innertube_host': 'youtubei.googleapis.com',
-                'comment_sort': 'top',
-                'max_comments': 0,
-                'max_comment_depth': 0
-            }
-        },
-        
-        # Format preferences
-        'format_sort': [
-            'res:1080',
-            'fps:30', 
-            'codec:h264',
-            'size',
-            'br',
-            'asr',
-            'proto'
-        ]
-    }
+def request_ydl_opts():
+    """Per-request yt-dlp options: rotating user agent and cookie file"""
+    opts = {'user_agent': next_user_agent()}
     
     # Add cookies if available
     if os.path.exists('cookies.txt'):
@@ -183,20 +1296,24 @@ def get_enhanced_ydl_opts():
     
     return opts
 
+def get_enhanced_ydl_opts():
+    """Get enhanced yt-dlp options with proper authentication"""
+    # yt-dlp keeps and mutates the dict it is given, so hand out a fresh one
+    return {**BASE_YDL_OPTS, **request_ydl_opts()}
+
+def is_youtube_url(url):
+    """True if url looks like a YouTube video URL"""
+    return isinstance(url, str) and YOUTUBE_URL_RE.match(url.strip()) is not None
+
 def extract_video_id(url):
     """Extract video ID from YouTube URL"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
-        r'youtube\.com\/shorts\/([^&\n?#]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     
     parsed = urlparse(url)
-    if parsed.hostname in ('www.youtube.com', 'youtube.com', 'm.youtube.com'):
+    if parsed.hostname in YOUTUBE_HOSTS:
         query = parse_qs(parsed.query)
         if 'v' in query:
             return query['v'][0]
@@ -213,13 +1330,11 @@ def try_alternative_extraction(url):
         # Try YouTube's oembed API
         oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
         
-        headers = {
-            'User-Agent': random.choice(USER_AGENTS),
-            'Referer': 'https://www.youtube.com/',
-            'Accept': 'application/json'
-        }
-        
-        response = requests.get(oembed_url, headers=headers, timeout=15)
+        response = http_session.get(
+            oembed_url,
+            headers={'User-Agent': next_user_agent()},
+            timeout=(3, 7)
+        )
         if response.status_code == 200:
             data = response.json()
             return {
@@ -239,41 +1354,253 @@ def try_alternative_extraction(url):
         
     return None
 
+def build_info_ydl(strategy):
+    """Create a YoutubeDL configured for one info extraction strategy"""
+    return yt_dlp.YoutubeDL({**get_enhanced_ydl_opts(), **INFO_YDL_OVERRIDES, **strategy})
+
+def checkout_ydl(key, strategy):
+    """Take an idle YoutubeDL for key from the pool, or build a new one"""
+    with ydl_pool_lock:
+        idle = ydl_pool.get(key)
+        if idle:
+            return idle.pop()
+    return build_info_ydl(strategy)
+
+def close_ydl(ydl, generation):
+    """Close a YoutubeDL built while cookies generation was current
+
+    Closing saves the cookie jar to the cookie file; an instance from an
+    older generation is closed without saving so it cannot overwrite
+    cookies uploaded since it was built.
+    """
+    with cookies_digest_lock:
+        if generation != cookies_generation:
+            ydl.params['cookiefile'] = None
+        ydl.close()
+
+def checkin_ydl(key, ydl):
+    """Return a YoutubeDL to the pool, closing it if the pool is full or stale"""
+    with ydl_pool_lock:
+        if key[2] == cookies_generation:
+            idle = ydl_pool.setdefault(key, [])
+            if len(idle) < MAX_IDLE_YDL:
+                idle.append(ydl)
+                return
+    close_ydl(ydl, key[2])
+
+def reset_ydl_pool():
+    """Drop pooled instances, e.g. after the cookie file changed"""
+    with ydl_pool_lock:
+        stale = [(key[2], ydl) for key, idle in ydl_pool.items() for ydl in idle]
+        ydl_pool.clear()
+    for generation, ydl in stale:
+        close_ydl(ydl, generation)
+
+def prewarm_ydl_pool():
+    """Fill the pool with one instance per info strategy
+
+    Building a YoutubeDL and loading the YouTube extractor takes long
+    enough to show up on the first /api/info after a restart.
+    """
+    has_cookies = os.path.exists('cookies.txt')
+    generation = cookies_generation
+    for i, strategy in enumerate(INFO_STRATEGIES):
+        try:
+            ydl = build_info_ydl(strategy)
+            ydl.get_info_extractor('Youtube')
+        except Exception as e:
+            print(f"Failed to prewarm YoutubeDL: {str(e)}")
+            return
+        checkin_ydl((i, has_cookies, generation), ydl)
+
+def extract_with_strategy(url, strategy):
+    """Run one info extraction strategy and return yt-dlp's info dict"""
+    key = (INFO_STRATEGIES.index(strategy), os.path.exists('cookies.txt'), cookies_generation)
+    ydl = checkout_ydl(key, strategy)
+    try:
+        return ydl.extract_info(url, download=False)
+    finally:
+        checkin_ydl(key, ydl)
+
+def race_info_strategies(url):
+    """Run every info strategy in parallel; return (index, info, errors)
+
+    The first strategy that returns info wins; info is None if all failed,
+    with errors mapping strategy index to its error message.
+    """
+    print(f"Trying {len(INFO_STRATEGIES)} extraction strategies in parallel")
+    futures = {
+        info_executor.submit(extract_with_strategy, url, strategy): i
+        for i, strategy in enumerate(INFO_STRATEGIES)
+    }
+    pending = set(futures)
+    errors = {}
+    
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = futures[future]
+            try:
+                info = future.result()
+            except Exception as e:
+                errors[i] = str(e)
+                print(f"Strategy {i+1} failed: {errors[i]}")
+                continue
+            
+            if not info:
+                continue
+            
+            # Strategies still queued are dropped; running ones finish in the background
+            for other in pending:
+                other.cancel()
+            return i, info, errors
+    
+    return None, None, errors
+
+def run_info_lookup(url, video_id):
+    """Race the strategies under an info slot and cache a successful payload
+
+    Returns None if no slot freed up in time, else (cached, errors) where
+    cached is (etag, payload, seconds left) as stored by cache_info, or
+    None if every strategy failed.
+    """
+    # Bound concurrent extractions; each one fans out to every strategy
+    if not info_slots.acquire(timeout=INFO_SLOT_WAIT):
+        return None
+    try:
+        winner, info, errors = race_info_strategies(url)
+    finally:
+        info_slots.release()
+    if not info:
+        return None, errors
+    payload = build_info_payload(info, url, video_id, winner + 1)
+    return (cache_info(video_id, payload), payload, INFO_CACHE_TTL), errors
+
+def shared_info_lookup(key, url, video_id):
+    """run_info_lookup, shared by concurrent requests for the same video
+
+    The payload is cached before waiting requests are released, so they
+    all answer with the same ETag. Waiting requests get None, like a
+    lookup that found no free slot, if the shared one takes too long.
+    """
+    with info_inflight_lock:
+        future = info_inflight.get(key)
+        leader = future is None
+        if leader:
+            future = info_inflight[key] = Future()
+    if not leader:
+        try:
+            return future.result(timeout=INFO_LOOKUP_TIMEOUT)
+        except TimeoutError:
+            return None
+    
+    try:
+        result = run_info_lookup(url, video_id)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with info_inflight_lock:
+            info_inflight.pop(key, None)
+
+def build_info_payload(info, url, video_id, strategy_used):
+    """Shape yt-dlp's info dict into the /api/info response"""
+    # Extract available formats
+    formats = []
+    audio_formats = []
+    
+    for f in info.get('formats', []):
+        _g = f.get
+        note = _g('format_note', '')
+        if note == 'storyboard':
+            continue
+        vcodec = _g('vcodec')
+        acodec = _g('acodec')
+            
+        # Video formats
+        if vcodec != 'none' and acodec == 'none':
+            height = _g('height') or 0
+            if height >= 240:
+                formats.append({
+                    'format_id': f['format_id'],
+                    'resolution': f"{height}p",
+                    'height': height,
+                    'fps': _g('fps', 30),
+                    'filesize': _g('filesize', 0),
+                    'filesize_approx': _g('filesize_approx', 0),
+                    'vcodec': vcodec or 'unknown',
+                    'ext': _g('ext', 'mp4'),
+                    'format_note': note
+                })
+        # Audio formats
+        elif acodec != 'none' and vcodec == 'none':
+            audio_formats.append({
+                'format_id': f['format_id'],
+                'abr': _g('abr') or 0,
+                'asr': _g('asr', 44100),
+                'acodec': acodec or 'unknown',
+                'filesize': _g('filesize', 0),
+                'filesize_approx': _g('filesize_approx', 0),
+                'ext': _g('ext', 'webm'),
+                'format_note': note
+            })
+    
+    # Only the top entries are returned; select them instead of sorting
+    # every format (same order as a stable descending sort)
+    top_video = heapq.nlargest(15, formats, key=itemgetter('height'))
+    top_audio = heapq.nlargest(8, audio_formats, key=itemgetter('abr'))
+    
+    best_video = top_video[0] if top_video else None
+    best_audio = top_audio[0] if top_audio else None
+    
+    _g = info.get
+    payload = dict.fromkeys(INFO_KEYS)
+    payload['title'] = _g('title', 'Unknown')
+    payload['thumbnail'] = _g('thumbnail', '')
+    payload['duration'] = _g('duration', 0)
+    payload['uploader'] = _g('uploader', 'Unknown')
+    payload['view_count'] = _g('view_count', 0)
+    payload['upload_date'] = _g('upload_date', '')
+    payload['description'] = (_g('description') or '')[:500]
+    payload['video_formats'] = top_video
+    payload['audio_formats'] = top_audio
+    payload['best_video'] = best_video
+    payload['best_audio'] = best_audio
+    payload['video_id'] = video_id
+    payload['webpage_url'] = _g('webpage_url', url)
+    payload['strategy_used'] = strategy_used
+    payload['formats_available'] = len(formats) > 0
+    payload['status'] = 'success'
+    return payload
+
 @app.route('/', methods=['GET'])
 def root():
-    return jsonify({
-        'service': 'Enhanced YouTube Downloader API',
-        'version': '3.0.0',
-        'status': 'running',
-        'features': [
-            'Cookie-based authentication',
-            'Enhanced bot detection bypass',
-            'Multiple extraction strategies',
-            'Automatic browser cookie extraction'
-        ],
-        'endpoints': {
-            'health': '/api/health',
-            'info': '/api/info',
-            'download': '/api/download',
-            'formats': '/api/formats',
-            'setup_cookies': '/api/setup-cookies',
-            'manual_cookies': '/api/manual-cookies',
-            'cookie_status': '/api/cookie-status',
-            'instructions': '/api/cookie-instructions'
-        }
-    })
+    return Response(ROOT_JSON, mimetype='application/json')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    cookie_status = 'available' if os.path.exists('cookies.txt') else 'missing'
+    global health_body
+    # Health checks come in bursts from monitors and the frontend;
+    # the rendered body is reused for HEALTH_TTL seconds
+    now = time.monotonic()
+    expires_at, body = health_body
+    if now >= expires_at:
+        cookie_status = 'available' if os.path.exists('cookies.txt') else 'missing'
+        body = HEALTH_TEMPLATE % {
+            'timestamp': datetime.now().isoformat(),
+            'cookie_status': cookie_status,
+            'active_downloads': active_downloads,
+            # free admission slots; read without acquiring the semaphore
+            'download_slots_free': download_slots._value,
+            'downloads_queued': download_executor._work_queue.qsize(),
+            'info_cache_bytes': info_cache.current_bytes
+        }
+        health_body = (now + HEALTH_TTL, body)
     
-    return jsonify({
-        'status': 'ok',
-        'timestamp': datetime.now().isoformat(),
-        'service': 'Enhanced YouTube Downloader API',
-        'yt_dlp_version': yt_dlp.version.__version__,
-        'cookie_status': cookie_status
-    })
+    return Response(body, mimetype='application/json')
 
 @app.route('/api/setup-cookies', methods=['POST'])
 def setup_cookies():
@@ -332,8 +1659,7 @@ def manual_cookies():
             cookies_content = '# Netscape HTTP Cookie File\n# Generated manually\n\n' + cookies_content
         
         # Save cookies
-        with open('cookies.txt', 'w') as f:
-            f.write(cookies_content)
+        store_cookie_file(cookies_content)
         
         # Validate by counting non-comment lines
         cookie_lines = [line for line in cookies_content.split('\n') 
@@ -438,15 +1764,20 @@ def cookie_instructions():
         'security_note': 'Cookies contain sensitive authentication data. Keep them secure and refresh regularly.'
     })
 
-@app.route('/api/info', methods=['POST'])
+@app.route('/api/info', methods=['GET', 'POST'])
 def get_video_info():
     try:
-        data = request.get_json()
-        url = data.get('url')
+        if request.method == 'GET':
+            url = request.args.get('url')
+        else:
+            url = request.get_json().get('url')
         
         if not url:
             return jsonify({'error': 'URL is required'}), 400
         
+        if not is_youtube_url(url):
+            return jsonify({'error': 'Invalid YouTube URL'}), 400
+        
         # Check for cookies
         if not os.path.exists('cookies.txt'):
             return jsonify({
@@ -459,155 +1790,75 @@ def get_video_info():
                 }
             }), 401
         
-        # Random delay to avoid detection
-        time.sleep(random.uniform(1, 3))
-        
-        # Try enhanced extraction strategies
-        strategies = [
-            # Strategy 1: iOS client with fresh headers
-            {
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios'],
-                        'player_skip': ['webpage', 'configs'],
-                        'skip': ['hls', 'dash', 'translated_subs']
-                    }
-                },
-                'http_headers': {
-                    'User-Agent': 'com.google.ios.youtube/19.29.1 (iPhone16,2; U; CPU iOS 17_5_1 like Mac OS X;)',
-                    'X-YouTube-Client-Name': '5',
-                    'X-YouTube-Client-Version': '19.29.1'
-                }
-            },
-            # Strategy 2: Android TV client
-            {
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['android_tv'],
-                        'player_skip': ['configs'],
-                        'skip': ['translated_subs']
-                    }
-                }
-            },
-            # Strategy 3: TV embed with bypass
-            {
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['tv_embed'],
-                        'player_skip': ['webpage'],
-                        'bypass_age_gate': True
-                    }
-                }
-            }
-        ]
+        video_id = extract_video_id(url)
+        cached = get_cached_info(video_id)
+        if cached:
+            etag, payload, max_age = cached
+            return info_response(payload, etag, max_age)
         
-        last_error = None
+        failure = cached_failure(video_id)
+        if failure:
+            payload, status_code, retry_after = failure
+            response = jsonify(payload)
+            response.status_code = status_code
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
+        # Cached answers above are free; only lookups count against the limit
+        limited = check_rate_limit()
+        if limited is not None:
+            return limited
+        
+        # Space out lookups from clients hitting YouTube back to back
+        wait_time = info_pacing.try_consume(request.remote_addr or 'unknown')
+        if wait_time:
+            retry_after = int(wait_time) + 1
+            response = jsonify({
+                'error': 'Too many requests',
+                'message': 'Video lookups are paced, try again shortly',
+                'retry_after': retry_after
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        # A download right after this lookup is still paced
+        note_youtube_hit(request.remote_addr)
+        
+        result = shared_info_lookup(video_id or url, url, video_id)
+        if result is None:
+            response = jsonify({
+                'error': 'Server busy',
+                'message': 'Too many video lookups in progress, try again shortly'
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
+        cached, errors = result
+        
+        if cached:
+            etag, payload, max_age = cached
+            return info_response(payload, etag, max_age)
+        
+        last_error = errors[max(errors)] if errors else None
+        
+        # Check for specific authentication errors
+        auth_errors = [error for error in errors.values()
+                       if any(phrase in error.lower() for phrase in ['sign in', 'bot', 'captcha', 'forbidden'])]
+        if auth_errors:
+            payload = {
+                'error': 'YouTube authentication challenge',
+                'message': 'YouTube is requesting additional verification',
+                'solutions': [
+                    'Refresh your browser cookies',
+                    'Visit YouTube and solve any CAPTCHA',
+                    'Update cookies using /api/setup-cookies',
+                    'Try again in a few minutes'
+                ],
+                'technical_error': auth_errors[0]
+            }
+            remember_failure(video_id, payload, 403)
+            return jsonify(payload), 403
         
-        for i, strategy in enumerate(strategies):
-            try:
-                print(f"Trying extraction strategy {i+1}/{len(strategies)}")
-                
-                ydl_opts = get_enhanced_ydl_opts()
-                ydl_opts.update({
-                    'extract_flat': False,
-                    'skip_download': True,
-                    'getcomments': False,
-                    'writesubtitles': False,
-                    'writeautomaticsub': False,
-                    'ignoreerrors': False
-                })
-                ydl_opts.update(strategy)
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    
-                    if not info:
-                        continue
-                    
-                    # Extract available formats
-                    formats = []
-                    audio_formats = []
-                    
-                    for f in info.get('formats', []):
-                        if f.get('format_note') == 'storyboard':
-                            continue
-                            
-                        # Video formats
-                        if f.get('vcodec') != 'none' and f.get('acodec') == 'none':
-                            height = f.get('height', 0)
-                            if height >= 240:
-                                formats.append({
-                                    'format_id': f['format_id'],
-                                    'resolution': f"{height}p",
-                                    'height': height,
-                                    'fps': f.get('fps', 30),
-                                    'filesize': f.get('filesize', 0),
-                                    'filesize_approx': f.get('filesize_approx', 0),
-                                    'vcodec': f.get('vcodec', 'unknown'),
-                                    'ext': f.get('ext', 'mp4'),
-                                    'format_note': f.get('format_note', '')
-                                })
-                        # Audio formats
-                        elif f.get('acodec') != 'none' and f.get('vcodec') == 'none':
-                            audio_formats.append({
-                                'format_id': f['format_id'],
-                                'abr': f.get('abr', 0),
-                                'asr': f.get('asr', 44100),
-                                'acodec': f.get('acodec', 'unknown'),
-                                'filesize': f.get('filesize', 0),
-                                'filesize_approx': f.get('filesize_approx', 0),
-                                'ext': f.get('ext', 'webm'),
-                                'format_note': f.get('format_note', '')
-                            })
-                    
-                    # Sort formats
-                    formats.sort(key=lambda x: x['height'], reverse=True)
-                    audio_formats.sort(key=lambda x: x['abr'], reverse=True)
-                    
-                    best_video = formats[0] if formats else None
-                    best_audio = audio_formats[0] if audio_formats else None
-                    
-                    return jsonify({
-                        'title': info.get('title', 'Unknown'),
-                        'thumbnail': info.get('thumbnail', ''),
-                        'duration': info.get('duration', 0),
-                        'uploader': info.get('uploader', 'Unknown'),
-                        'view_count': info.get('view_count', 0),
-                        'upload_date': info.get('upload_date', ''),
-                        'description': info.get('description', '')[:500],
-                        'video_formats': formats[:15],
-                        'audio_formats': audio_formats[:8],
-                        'best_video': best_video,
-                        'best_audio': best_audio,
-                        'video_id': extract_video_id(url),
-                        'webpage_url': info.get('webpage_url', url),
-                        'strategy_used': i + 1,
-                        'formats_available': len(formats) > 0,
-                        'status': 'success'
-                    })
-                    
-            except Exception as e:
-                last_error = str(e)
-                print(f"Strategy {i+1} failed: {last_error}")
-                
-                # Check for specific authentication errors
-                if any(phrase in last_error.lower() for phrase in ['sign in', 'bot', 'captcha', 'forbidden']):
-                    return jsonify({
-                        'error': 'YouTube authentication challenge',
-                        'message': 'YouTube is requesting additional verification',
-                        'solutions': [
-                            'Refresh your browser cookies',
-                            'Visit YouTube and solve any CAPTCHA',
-                            'Update cookies using /api/setup-cookies',
-                            'Try again in a few minutes'
-                        ],
-                        'technical_error': last_error
-                    }), 403
-                
-                if i < len(strategies) - 1:
-                    time.sleep(random.uniform(2, 5))
-                    continue
-                
         # Try alternative extraction as fallback
         alt_info = try_alternative_extraction(url)
         if alt_info:
@@ -616,7 +1867,7 @@ def get_video_info():
             return jsonify(alt_info)
         
         # All methods failed
-        return jsonify({
+        payload = {
             'error': 'Complete extraction failure',
             'message': 'All extraction methods failed',
             'last_error': str(last_error),
@@ -626,7 +1877,9 @@ def get_video_info():
                 'Try again later as YouTube may have temporary restrictions',
                 'Update yt-dlp: pip install --upgrade yt-dlp'
             ]
-        }), 503
+        }
+        remember_failure(video_id, payload, 503)
+        return jsonify(payload), 503
             
     except Exception as e:
         return jsonify({
@@ -635,198 +1888,218 @@ def get_video_info():
         }), 500
 
 @app.route('/api/download', methods=['POST'])
+@rate_limited
 def download_video():
+    global pending_downloads
     try:
         data = request.get_json()
         url = data.get('url')
         quality = data.get('quality', 'best')
         audio_quality = data.get('audio_quality', 'best')
         
+        concurrent_fragments = data.get('concurrent_fragments')
+        if concurrent_fragments is not None:
+            try:
+                concurrent_fragments = int(concurrent_fragments)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'concurrent_fragments must be an integer'}), 400
+            concurrent_fragments = max(1, min(concurrent_fragments, MAX_CONCURRENT_FRAGMENTS))
+        
         if not url:
             return jsonify({'error': 'URL is required'}), 400
         
+        if not is_youtube_url(url):
+            return jsonify({'error': 'Invalid YouTube URL'}), 400
+        
         if not os.path.exists('cookies.txt'):
             return jsonify({
                 'error': 'Authentication required',
                 'message': 'Please set up cookies first using /api/setup-cookies'
             }), 401
         
-        download_id = str(uuid.uuid4())
-        progress_tracker = DownloadProgress(download_id)
-        download_progress[download_id] = progress_tracker
+        if not download_slots.acquire(blocking=False):
+            response = jsonify({
+                'error': 'Server busy',
+                'message': 'Too many downloads in progress, try again shortly'
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = '30'
+            return response
         
-        thread = threading.Thread(
-            target=perform_enhanced_download,
-            args=(url, quality, audio_quality, progress_tracker)
-        )
-        thread.daemon = True
-        thread.start()
+        try:
+            download_id = str(uuid.uuid4())
+            progress_tracker = DownloadProgress(download_id)
+            track_progress(progress_tracker)
+            progress_tracker.save()
+            pace = note_youtube_hit(request.remote_addr)
+            
+            with active_downloads_lock:
+                # 0 if a worker is free, else the download's place among
+                # those waiting; the executor starts them in submission order
+                queue_position = max(0, pending_downloads - DOWNLOAD_WORKERS + 1)
+                future = download_executor.submit(
+                    perform_enhanced_download,
+                    url, quality, audio_quality, progress_tracker, concurrent_fragments, pace
+                )
+                pending_downloads += 1
+        except Exception:
+            download_slots.release()
+            raise
+        progress_tracker.future = future
+        future.add_done_callback(finish_pending_download)
         
         return jsonify({
             'download_id': download_id,
-            'status': 'started'
+            'status': 'started',
+            'queue_position': queue_position
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def perform_enhanced_download(url, quality, audio_quality, progress_tracker):
-    """Enhanced download with authentication and multiple strategies"""
-    temp_dir = tempfile.mkdtemp()
+def finish_pending_download(future):
+    """Done callback of a download's future; frees its pending slot"""
+    global pending_downloads
+    with active_downloads_lock:
+        pending_downloads -= 1
+    download_slots.release()
+
+def expected_size(info):
+    """Bytes yt-dlp expects to fetch for info, 0 if unknown"""
+    return sum(f.get('filesize') or f.get('filesize_approx') or 0
+               for f in info.get('requested_formats') or (info,))
+
+def find_downloaded_file(info, temp_dir, finished_files=()):
+    """Return the path of the finished media file in temp_dir, if any"""
+    # The hooks saw the file being written; the last one is the final output
+    for file_path in reversed(finished_files):
+        if os.path.exists(file_path):
+            return file_path
+    # yt-dlp reports the final (post-merge) path of each download
+    for download in info.get('requested_downloads') or ():
+        file_path = download.get('filepath')
+        if file_path and os.path.exists(file_path):
+            return file_path
+    with os.scandir(temp_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(MEDIA_EXTENSIONS):
+                return entry.path
+    return None
+
+@app.route('/api/download/<download_id>', methods=['DELETE'])
+def cancel_download(download_id):
+    """Cancel a download that is still waiting for a worker"""
+    progress = load_progress(download_id)
+    if progress is None:
+        return jsonify({'error': 'Download not found'}), 404
+    
+    # Only queued jobs can be withdrawn; yt-dlp cannot be stopped mid-transfer
+    if progress.future is None or not progress.future.cancel():
+        return jsonify({'error': 'Download already started'}), 409
+    
+    with progress.lock:
+        progress.status = 'error'
+        progress.error = 'Cancelled'
+    progress.save()
+    return jsonify({'download_id': download_id, 'status': 'cancelled'})
+
+def perform_enhanced_download(url, quality, audio_quality, progress_tracker,
+                              concurrent_fragments=None, pace=True):
+    """Enhanced download with authentication and multiple strategies
+
+    Without an explicit concurrent_fragments the tuned level is used, and
+    the download's throughput is fed back to the tuner unless aria2c did
+    the fetching.
+    """
+    global active_downloads
+    tuned = concurrent_fragments is None
+    if tuned:
+        concurrent_fragments = fragment_tuner.current()
+        tuned = not USE_ARIA2C
+    temp_dir = os.path.join(WORK_DIR, progress_tracker.download_id)
+    os.makedirs(temp_dir, exist_ok=True)
+    with active_downloads_lock:
+        active_downloads += 1
+    progress_tracker.status = 'preparing'
+    progress_tracker.save()
     
     try:
-        # Random delay
-        time.sleep(random.uniform(2, 5))
+        # Random delay, when the client recently had us contact YouTube
+        if pace:
+            random_delay(2, 5)
+        
+        # Files yt-dlp reported as finished, post-processing included
+        finished_files = []
+        # [bytes, seconds] fetched over all finished streams, for the tuner
+        transferred = [0, 0.0]
         
         def progress_hook(d):
             progress_tracker.update(d)
+            if d['status'] == 'finished':
+                if d.get('filename'):
+                    finished_files.append(d['filename'])
+                if d.get('downloaded_bytes') and d.get('elapsed'):
+                    transferred[0] += d['downloaded_bytes']
+                    transferred[1] += d['elapsed']
         
-        # Enhanced format selection for better compatibility
-        format_map = {
-            'best': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-            '8k': 'bestvideo[height<=4320]+bestaudio/best[height<=4320]/best',
-            '4k': 'bestvideo[height<=2160]+bestaudio/best[height<=2160]/best',
-            '2k': 'bestvideo[height<=1440]+bestaudio/best[height<=1440]/best',
-            '1080p': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
-            '720p': 'bestvideo[height<=720]+bestaudio/best[height<=720]/best',
-            '480p': 'bestvideo[height<=480]+bestaudio/best[height<=480]/best',
-            '360p': 'bestvideo[height<=360]+bestaudio/best[height<=360]/best',
-            '240p': 'bestvideo[height<=240]+bestaudio/best[height<=240]/best'
-        }
+        def postprocessor_hook(d):
+            if d['status'] == 'finished':
+                file_path = d.get('info_dict', {}).get('filepath')
+                if file_path:
+                    finished_files.append(file_path)
         
-        format_string = format_map.get(quality, 'best')
-        output_template = os.path.join(temp_dir, '%(title).200B.%(ext)s')
-        
-        # Enhanced download strategies
-        strategies = [
-            # Strategy 1: Mobile client with minimal options
-            {
-                'format': 'best[height<=720]/best',  # Lower quality for mobile
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios'],
-                        'player_skip': ['webpage', 'configs', 'js'],
-                        'skip': ['hls', 'dash', 'translated_subs']
-                    }
-                },
-                'http_headers': {
-                    'User-Agent': 'com.google.ios.youtube/19.29.1 (iPhone16,2; U; CPU iOS 17_5_1 like Mac OS X;)',
-                    'Accept': '*/*',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'X-YouTube-Client-Name': '5',
-                    'X-YouTube-Client-Version': '19.29.1'
-                }
-            },
-            # Strategy 2: Android client
-            {
-                'format': format_string,
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['android'],
-                        'player_skip': ['webpage', 'configs'],
-                        'skip': ['hls', 'dash']
-                    }
-                },
-                'http_headers': {
-                    'User-Agent': 'com.google.android.youtube/19.29.37 (Linux; U; Android 13; en_US)',
-                    'X-YouTube-Client-Name': '3',
-                    'X-YouTube-Client-Version': '19.29.37'
-                }
-            },
-            # Strategy 3: Web client with cookie refresh
-            {
-                'format': format_string,
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['web'],
-                        'player_skip': ['js'],
-                        'skip': ['hls', 'translated_subs']
-                    }
-                },
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-            },
-            # Strategy 4: TV embedded player (often bypasses restrictions)
-            {
-                'format': 'best[height<=1080]/best',
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['tv_embedded'],
-                        'player_skip': ['webpage', 'configs'],
-                        'bypass_age_gate': True
-                    }
-                }
-            },
-            # Strategy 5: Direct format ID (fallback)
-            {
-                'format': '22/18/best',  # Direct format IDs for 720p/360p
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['android'],
-                        'skip': ['hls', 'dash', 'translated_subs']
-                    }
-                }
-            }
-        ]
+        templates = DOWNLOAD_OPTS_TEMPLATES.get(quality)
+        if templates is None:
+            templates = tuple(build_download_template('best', strategy) for strategy in DOWNLOAD_STRATEGIES)
+        download_opts = {
+            'concurrent_fragment_downloads': concurrent_fragments,
+            'outtmpl': os.path.join(temp_dir, '%(title).200B.%(ext)s'),
+            'progress_hooks': [progress_hook],
+            'postprocessor_hooks': [postprocessor_hook]
+        }
         
         last_error = None
         
-        for i, strategy in enumerate(strategies):
+        for i, template in enumerate(templates):
             try:
-                print(f"Download strategy {i+1}/{len(strategies)}")
+                print(f"Download strategy {i+1}/{len(templates)}")
+                finished_files.clear()
+                transferred[:] = [0, 0.0]
                 
-                ydl_opts = get_enhanced_ydl_opts()
-                ydl_opts.update({
-                    'format': strategy.get('format', format_string),
-                    'outtmpl': output_template,
-                    'progress_hooks': [progress_hook],
-                    'merge_output_format': 'mp4',
-                    'prefer_ffmpeg': True,
-                    'keepvideo': False,
-                    'writeinfojson': False,
-                    'writethumbnail': False,
-                    'writesubtitles': False,
-                    'writeautomaticsub': False,
-                    'getcomments': False,
-                    'ignoreerrors': False,
-                    'no_check_certificate': True,  # Add this
-                    'geo_bypass': True,  # Add this
-                    'geo_bypass_country': 'US',  # Add this
-                    'prefer_insecure': True  # Add this
-                })
-                
-                # Merge strategy options
-                if 'extractor_args' in strategy:
-                    ydl_opts['extractor_args'] = strategy['extractor_args']
-                if 'http_headers' in strategy:
-                    ydl_opts['http_headers'].update(strategy['http_headers'])
+                ydl_opts = {**template, **request_ydl_opts(), **download_opts}
                 
                 # Add random sleep between retries
                 if i > 0:
-                    time.sleep(random.uniform(3, 8))
+                    random_delay(3, 8)
                 
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                     info = ydl.extract_info(url, download=True)
                     progress_tracker.title = info.get('title', 'Unknown')
                     progress_tracker.thumbnail = info.get('thumbnail', '')
                     
-                    # Find downloaded file
-                    for file in os.listdir(temp_dir):
-                        if file.endswith(('.mp4', '.webm', '.mkv', '.mov', '.avi', '.m4a', '.mp3')):
-                            progress_tracker.file_path = os.path.join(temp_dir, file)
-                            progress_tracker.filename = file
-                            break
+                    if info.get('requested_formats'):
+                        print(f"Merged {len(info['requested_formats'])} streams with ffmpeg")
+                    else:
+                        print("Downloaded pre-muxed stream, no merge needed")
+                    
+                    file_path = find_downloaded_file(info, temp_dir, finished_files)
+                    # yt-dlp skips oversized files without raising; other
+                    # strategies would pick the same formats, so stop here
+                    if not file_path and MAX_DOWNLOAD_BYTES and expected_size(info) > MAX_DOWNLOAD_BYTES:
+                        with progress_tracker.lock:
+                            progress_tracker.error = f'Video is larger than the {MAX_DOWNLOAD_BYTES // 2**20} MB download limit'
+                            progress_tracker.status = 'error'
+                        return
+                    if file_path:
+                        with progress_tracker.lock:
+                            progress_tracker.file_path = file_path
+                            progress_tracker.filename = os.path.basename(file_path)
+                            progress_tracker.status = 'completed'
                     
                     if progress_tracker.file_path:
-                        progress_tracker.status = 'completed'
+                        progress_tracker.save()
+                        if tuned and transferred[1] > 0:
+                            fragment_tuner.record(transferred[0] / transferred[1])
                         return
                         
             except Exception as e:
@@ -844,22 +2117,25 @@ def perform_enhanced_download(url, quality, audio_quality, progress_tracker):
                     progress_tracker.error = 'Video is unavailable in your region or has been removed.'
                 else:
                     progress_tracker.error = f'Strategy {i+1} failed: {last_error}'
+                progress_tracker.save()
                 
-                if i < len(strategies) - 1:
+                if i < len(templates) - 1:
                     continue
                     
-        progress_tracker.error = f'All download strategies failed. Last error: {last_error}'
-        progress_tracker.status = 'error'
+        with progress_tracker.lock:
+            progress_tracker.error = f'All download strategies failed. Last error: {last_error}'
+            progress_tracker.status = 'error'
                     
     except Exception as e:
-        progress_tracker.status = 'error'
-        progress_tracker.error = str(e)
+        with progress_tracker.lock:
+            progress_tracker.status = 'error'
+            progress_tracker.error = str(e)
     finally:
-        if progress_tracker.status == 'error' and os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-            except:
-                pass
+        with active_downloads_lock:
+            active_downloads -= 1
+        if progress_tracker.status == 'error':
+            progress_tracker.save()
+            schedule_cleanup(temp_dir)
 
 # Add request validation
 @app.before_request
@@ -869,65 +2145,134 @@ def validate_request():
             return jsonify({'error': 'Content-Type must be application/json'}), 400
         
 
-# Add cleanup for old progress entries
-def cleanup_old_downloads():
-    current_time = time.time()
-    for download_id in list(download_progress.keys()):
-        # Remove downloads older than 1 hour
-        if current_time - download_progress[download_id].start_time > 3600:
-            del download_progress[download_id]
-
 @app.route('/api/progress/<download_id>', methods=['GET'])
 def get_progress(download_id):
-    if download_id not in download_progress:
+    progress = load_progress(download_id)
+    if progress is None:
         return jsonify({'error': 'Download not found'}), 404
     
-    progress = download_progress[download_id]
+    # Polled once a second per download; the body is only rebuilt after a
+    # change, and unchanged polls get a bodiless 304
+    version, body = progress.snapshot()
+    etag = str(version)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/progress/<download_id>/stream', methods=['GET'])
+def stream_progress(download_id):
+    """Push progress as Server-Sent Events until the download finishes"""
+    progress = load_progress(download_id)
+    if progress is None:
+        return jsonify({'error': 'Download not found'}), 404
     
-    return jsonify({
-        'status': progress.status,
-        'progress': progress.progress,
-        'speed': progress.speed,
-        'eta': progress.eta,
-        'size': progress.size,
-        'title': progress.title,
-        'thumbnail': progress.thumbnail,
-        'error': progress.error,
-        'filename': progress.filename
-    })
+    def generate():
+        tracker = progress
+        last_state = None
+        idle = 0
+        # Announcements seen for the download, once following one that
+        # runs on another host
+        seen = None
+        try:
+            while tracker is not None:
+                version = tracker.version
+                state = tracker.to_dict(PUBLIC_PROGRESS_FIELDS)
+                if state != last_state:
+                    yield b'data: ' + orjson.dumps(state) + b'\n\n'
+                    last_state = state
+                    idle = 0
+                elif idle >= SSE_KEEPALIVE:
+                    # Comment line, keeps proxies from closing an idle stream
+                    yield b': keepalive\n\n'
+                    idle = 0
+                if state['status'] in ('completed', 'error'):
+                    return
+                with download_progress_lock:
+                    local = download_progress.get(download_id) is tracker
+                if local or redis_client is None:
+                    with tracker.changed:
+                        tracker.changed.wait_for(lambda: tracker.version != version, timeout=1)
+                else:
+                    # Downloads running on another host only change in Redis
+                    if seen is None:
+                        seen = progress_events.follow(download_id)
+                    seen = progress_events.wait(download_id, seen, timeout=1)
+                idle += 1
+                tracker = load_progress(download_id)
+        finally:
+            if seen is not None:
+                progress_events.unfollow(download_id)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/download/<download_id>/file', methods=['GET'])
+@compress.exempt
 def download_file(download_id):
-    if download_id not in download_progress:
+    progress = load_progress(download_id)
+    if progress is None:
         return jsonify({'error': 'Download not found'}), 404
     
-    progress = download_progress[download_id]
-    
     if progress.status != 'completed' or not progress.file_path:
         return jsonify({'error': 'Download not completed'}), 400
     
+    # The file lives on the host that ran the download; without sticky
+    # sessions or shared storage another host cannot serve it
+    if not os.path.exists(progress.file_path):
+        return jsonify({'error': 'Download file is not available on this server'}), 404
+    
+    extension = os.path.splitext(progress.file_path)[1].lower()
+    mimetype = MEDIA_MIMETYPES.get(extension, 'application/octet-stream')
+    
+    # Files that are not fetched in full are left to the janitor's sweep
+    ensure_janitor()
+    
+    # Behind nginx, hand the transfer off with X-Accel-Redirect; the work
+    # directory is then left to the janitor's age-based sweep
+    if ACCEL_REDIRECT_PREFIX:
+        relative = os.path.relpath(progress.file_path, WORK_DIR)
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = ACCEL_REDIRECT_PREFIX + quote(relative.replace(os.sep, '/'))
+        set_attachment(response.headers, progress.filename)
+        return response
+    
     try:
-        def generate():
-            with open(progress.file_path, 'rb') as f:
-                while True:
-                    data = f.read(4096)
-                    if not data:
-                        break
-                    yield data
-            
-            # Cleanup
+        def cleanup():
             temp_dir = os.path.dirname(progress.file_path)
-            if os.path.exists(temp_dir) and temp_dir.startswith(tempfile.gettempdir()):
-                try:
-                    shutil.rmtree(temp_dir)
-                except:
-                    pass
-            
-            if download_id in download_progress:
-                del download_progress[download_id]
+            if os.path.dirname(temp_dir) == WORK_DIR:
+                schedule_cleanup(temp_dir)
+            forget_progress(download_id)
+        
+        stat = os.stat(progress.file_path)
+        file = CleanupFile(progress.file_path, cleanup if request.method == 'GET' else None)
+        
+        # send_file hands the file to the WSGI server's file_wrapper;
+        # Range requests are answered below. The early cleanup counts the
+        # bytes read, so it needs the body streamed through read() (the
+        # shipped gunicorn config turns sendfile off for this)
+        response = send_file(
+            file,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=progress.filename,
+            last_modified=stat.st_mtime,
+            etag=False
+        )
+        response.content_length = stat.st_size
+        response.set_etag(f'{download_id}-{stat.st_size}-{int(stat.st_mtime)}')
+        response = response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+        
+        # Only a complete transfer ends the download; partial (206) or
+        # cached (304) responses leave the file in place for resuming
+        if response.status_code != 200:
+            file.disarm()
         
-        response = Response(generate(), mimetype='video/mp4')
-        response.headers['Content-Disposition'] = f'attachment; filename="{progress.filename}"'
         return response
         
     except Exception as e:
@@ -935,20 +2280,9 @@ def download_file(download_id):
 
 @app.route('/api/formats', methods=['GET'])
 def get_supported_formats():
-    return jsonify({
-        'video_qualities': [
-            {'id': 'best', 'label': 'Best Available', 'description': 'Highest quality available'},
-            {'id': '8k', 'label': '8K (4320p)', 'description': 'Ultra HD 8K'},
-            {'id': '4k', 'label': '4K (2160p)', 'description': 'Ultra HD 4K'},
-            {'id': '2k', 'label': '2K (1440p)', 'description': 'Quad HD'},
-            {'id': '1080p', 'label': '1080p', 'description': 'Full HD'},
-            {'id': '720p', 'label': '720p', 'description': 'HD'},
-            {'id': '480p', 'label': '480p', 'description': 'SD'},
-            {'id': '360p', 'label': '360p', 'description': 'Low'},
-            {'id': '240p', 'label': '240p', 'description': 'Very Low'},
-        ],
-        'note': 'Enhanced with cookie-based authentication and bot detection bypass'
-    })
+    response = Response(FORMATS_JSON, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=86400, immutable'
+    return response
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
@@ -994,6 +2328,11 @@ def not_found(e):
 def server_error(e):
     return jsonify({'error': 'Internal server error'}), 500
 
+# Module state (option templates, yt-dlp and Flask internals) lives for the
+# whole process; keep it out of the cyclic collector's scans
+gc.freeze()
+threading.Thread(target=prewarm_ydl_pool, name='ydl-prewarm', daemon=True).start()
+
 if __name__ == '__main__':
     print("Starting Enhanced YouTube Downloader API...")
     print("Features: Cookie authentication, Bot detection bypass, Multiple strategies")
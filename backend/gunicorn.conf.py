@@ -0,0 +1,46 @@
+"""Gunicorn settings for the YouTube downloader API
+
+Run with: gunicorn app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Deployed behind one reverse proxy (Render's); app.py trusts that many
+# X-Forwarded-For hops for client addresses. Set it to 0 when clients
+# reach gunicorn directly.
+os.environ.setdefault('TRUSTED_PROXY_HOPS', '1')
+
+# Threaded workers: app.py runs downloads and info strategies on real
+# ThreadPoolExecutor threads; in a gevent worker those become greenlets
+# on one OS thread, and yt-dlp's CPU-bound page parsing stalls every
+# other request while it runs. With a thread per request, /api/progress
+# polls are still served during long /api/info calls. Download progress
+# lives in process memory unless REDIS_URL is set, so only raise the
+# worker count together with Redis.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+# Only used with GUNICORN_WORKER_CLASS=gevent
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# No preload_app: app.py starts threads at import, which do not survive
+# the fork into workers, so each worker imports the app itself.
+
+# Worker heartbeat files on tmpfs; a disk-backed /tmp can stall the
+# heartbeat under I/O load and get workers killed
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# /api/info can spend a while retrying strategies
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# No sendfile: os.sendfile bypasses read(), so app.py cannot tell that a
+# download was sent in full and its early cleanup never runs; the files
+# would stay on disk until the janitor's sweep. Deployments that need
+# zero-copy transfers should set ACCEL_REDIRECT_PREFIX and let nginx send
+# the files instead.
+sendfile = False